@@ -1,37 +1,50 @@
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from passlib.context import CryptContext
-from jose import JWTError, jwt
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+import copy
 import json
 import os
+from common.security import get_context
+from common.ratelimit import login_guard
+from common.storage import read_json, write_json
 
 SECRET_KEY = "your-secret-key-here-change-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = get_context("notes")
 
 security = HTTPBearer()
 
-USERS_FILE = "users.json"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+USERS_FILE = os.path.join(BASE_DIR, "users.json")
+
+# Hashing the default passwords is slow, so it happens once per process.
+# Run seed.py to write users.json ahead of time instead.
+@lru_cache(maxsize=None)
+def build_default_users():
+    return {
+        "john": {
+            "username": "john",
+            "password": hash_password("john123")
+        },
+        "jane": {
+            "username": "jane", 
+            "password": hash_password("jane123")
+        }
+    }
 
 def load_users():
     try:
-        if os.path.exists(USERS_FILE):
-            with open(USERS_FILE, 'r') as f:
-                return json.load(f)
-        default_users = {
-            "john": {
-                "username": "john",
-                "password": hash_password("john123")
-            },
-            "jane": {
-                "username": "jane", 
-                "password": hash_password("jane123")
-            }
-        }
-        save_users(default_users)
+        users = read_json(USERS_FILE)
+        if users is not None:
+            return users
+        default_users = copy.deepcopy(build_default_users())
+        try:
+            save_users(default_users)
+        except HTTPException as e:
+            print(f"Error seeding users file: {e.detail}")
         return default_users
     except (json.JSONDecodeError, IOError) as e:
         print(f"Error loading users file: {e}")
@@ -39,8 +52,7 @@ def load_users():
 
 def save_users(users_data):
     try:
-        with open(USERS_FILE, 'w') as f:
-            json.dump(users_data, f, indent=2)
+        write_json(USERS_FILE, users_data)
     except IOError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -50,33 +62,33 @@ def save_users(users_data):
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
+# jose is imported on first use rather than at startup; warm_up() in
+# main.py loads it before the first request.
 def create_access_token(data: dict, expires_delta: timedelta = None):
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
-        expire = datetime.now(datetime.timezone.utc) + expires_delta
+        expire = datetime.now(timezone.utc) + expires_delta
     else:
-        expire = datetime.now(datetime.timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def authenticate_user(username: str, password: str):
-    users = load_users()
-    
-    if username not in users:
-        return False
-    
-    user_data = users[username]
-    if not verify_password(password, user_data["password"]):
+def authenticate_user(username: str, password: str, client_ip: str):
+    user_data = login_guard.authenticate(
+        username, password, client_ip, USERS_FILE, load_users, pwd_context
+    )
+    if user_data is None:
         return False
     
     return user_data
 
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    from jose import JWTError, jwt
+
     token = credentials.credentials
     
     credentials_exception = HTTPException(
@@ -1,10 +1,19 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Request, status
 from pydantic import BaseModel
 from typing import List
 from datetime import datetime, date, timedelta
 import json
 import os
-from auth import authenticate_user, create_access_token, get_current_user
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.security import warm_up_context
+from common.ratelimit import login_guard, client_ip
+from common.storage import read_json, write_json
+from auth import authenticate_user, create_access_token, get_current_user, load_users, pwd_context
 
 app = FastAPI(title="Notes Management API", version="1.0.0")
 
@@ -33,16 +42,15 @@ class NoteResponse(BaseModel):
     date: str
     created_at: str
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
 def get_user_notes_file(username: str) -> str:
-    return f"notes_{username}.json"
+    return os.path.join(BASE_DIR, f"notes_{username}.json")
 
 def load_notes(username: str):
     notes_file = get_user_notes_file(username)
     try:
-        if os.path.exists(notes_file):
-            with open(notes_file, 'r') as f:
-                return json.load(f)
-        return []
+        return read_json(notes_file, [])
     except (json.JSONDecodeError, IOError) as e:
         print(f"Error loading notes file for {username}: {e}")
         return []
@@ -50,8 +58,7 @@ def load_notes(username: str):
 def save_notes(username: str, notes_data):
     notes_file = get_user_notes_file(username)
     try:
-        with open(notes_file, 'w') as f:
-            json.dump(notes_data, f, indent=2, default=str)
+        write_json(notes_file, notes_data, default=str)
     except IOError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -65,13 +72,23 @@ def get_next_note_id(username: str):
     return max(note["id"] for note in notes) + 1
 
 
+@app.on_event("startup")
+def warm_up():
+    load_users()
+    warm_up_context(pwd_context)
+    create_access_token({"sub": "warm-up"})
+
 @app.get("/")
 def root():
     return {"message": "Notes Management API"}
 
+@app.get("/login_stats/")
+def login_stats():
+    return login_guard.stats()
+
 @app.post("/login/", response_model=Token)
-def login(user_credentials: UserLogin):
-    user = authenticate_user(user_credentials.username, user_credentials.password)
+def login(user_credentials: UserLogin, request: Request):
+    user = authenticate_user(user_credentials.username, user_credentials.password, client_ip(request))
     
     if not user:
         raise HTTPException(
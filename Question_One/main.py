@@ -1,6 +1,15 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Request, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from student import load_students, hash_password, StudentCreate, save_students, get_current_student, StudentResponse
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from student import load_students, hash_password, StudentCreate, update_students, get_current_student, StudentResponse, pwd_context
+from common.security import warm_up_context
+from common.ratelimit import login_guard
 
 app = FastAPI(title="Student Portal API", version="1.0.0")
 
@@ -10,28 +19,35 @@ security = HTTPBasic()
 
 @app.post("/register/", response_model=dict)
 def register_student(student: StudentCreate):
-    students = load_students()
+    student_exists = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Student already exists"
+    )
     
-    if student.username in students:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Student already exists"
-        )
+    if student.username in load_students():
+        raise student_exists
     
     hashed_password = hash_password(student.password)
-    students[student.username] = {
-        "username": student.username,
-        "password": hashed_password,
-        "grades": student.grades
-    }
     
-    save_students(students)
+    # Checked again under the file lock: the same username may have been
+    # registered while the password was being hashed.
+    def add_student(students):
+        if student.username in students:
+            raise student_exists
+        students[student.username] = {
+            "username": student.username,
+            "password": hashed_password,
+            "grades": student.grades
+        }
+        return students
+    
+    update_students(add_student)
     
     return {"message": "Student registered successfully"}
 
 @app.post("/login/", response_model=dict)
-def login_student(credentials: HTTPBasicCredentials = Depends(security)):
-    student = get_current_student(credentials)
+def login_student(request: Request, credentials: HTTPBasicCredentials = Depends(security)):
+    student = get_current_student(request, credentials)
     return {"message": "Login successful", "username": student["username"]}
 
 @app.get("/grades/", response_model=StudentResponse)
@@ -41,6 +57,15 @@ def get_grades(student: dict = Depends(get_current_student)):
         grades=student["grades"]
     )
 
+@app.get("/login_stats/")
+def login_stats():
+    return login_guard.stats()
+
+@app.on_event("startup")
+def warm_up():
+    load_students()
+    warm_up_context(pwd_context)
+
 @app.get("/")
 def root():
     return {"message": "Student Portal API"}
@@ -1,12 +1,14 @@
-from fastapi import HTTPException, Depends, status
+from fastapi import HTTPException, Depends, Request, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from pydantic import BaseModel
-from passlib.context import CryptContext
 import json
 import os
 from typing import List
+from common.security import get_context
+from common.ratelimit import login_guard, client_ip
+from common.storage import read_json, update_json, write_json
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = get_context("students")
 
 security = HTTPBasic()
 
@@ -25,46 +27,43 @@ class StudentResponse(BaseModel):
     grades: List[float]
 
 # File operations
-STUDENTS_FILE = "students.json"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STUDENTS_FILE = os.path.join(BASE_DIR, "students.json")
 
 def load_students():
     try:
-        if os.path.exists(STUDENTS_FILE):
-            with open(STUDENTS_FILE, 'r') as f:
-                return json.load(f)
-        return {}
+        return read_json(STUDENTS_FILE, {})
     except (json.JSONDecodeError, IOError) as e:
         print(f"Error loading students file: {e}")
         return {}
 
 def save_students(students_data):
     try:
-        with open(STUDENTS_FILE, 'w') as f:
-            json.dump(students_data, f, indent=2)
+        write_json(STUDENTS_FILE, students_data)
     except IOError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error saving student data: {str(e)}"
         )
 
+def update_students(update):
+    try:
+        return update_json(STUDENTS_FILE, update, {})
+    except (json.JSONDecodeError, IOError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error saving student data: {str(e)}"
+        )
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_current_student(credentials: HTTPBasicCredentials = Depends(security)):
-    students = load_students()
-    
-    if credentials.username not in students:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid credentials",
-            headers={"WWW-Authenticate": "Basic"},
-        )
-    
-    student_data = students[credentials.username]
-    if not verify_password(credentials.password, student_data["password"]):
+def get_current_student(request: Request, credentials: HTTPBasicCredentials = Depends(security)):
+    student_data = login_guard.authenticate(
+        credentials.username, credentials.password, client_ip(request),
+        STUDENTS_FILE, load_students, pwd_context
+    )
+    if student_data is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
@@ -4,11 +4,21 @@ from typing import List, Optional
 from datetime import datetime, date
 import json
 import os
-from auth import get_current_user
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.security import warm_up_context
+from common.ratelimit import login_guard
+from common.storage import read_json, write_json
+from auth import get_current_user, load_users, pwd_context
 
 app = FastAPI(title="Job Application Tracker API", version="1.0.0")
 
-APPLICATIONS_FILE = "applications.json"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APPLICATIONS_FILE = os.path.join(BASE_DIR, "applications.json")
 
 class JobApplication(BaseModel):
     job_title: str
@@ -33,18 +43,14 @@ class JobApplicationResponse(BaseModel):
 
 def load_applications():
     try:
-        if os.path.exists(APPLICATIONS_FILE):
-            with open(APPLICATIONS_FILE, 'r') as f:
-                return json.load(f)
-        return []
+        return read_json(APPLICATIONS_FILE, [])
     except (json.JSONDecodeError, IOError) as e:
         print(f"Error loading applications file: {e}")
         return []
 
 def save_applications(applications_data):
     try:
-        with open(APPLICATIONS_FILE, 'w') as f:
-            json.dump(applications_data, f, indent=2, default=str)
+        write_json(APPLICATIONS_FILE, applications_data, default=str)
     except IOError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -61,10 +67,20 @@ def get_user_applications(username: str):
     applications = load_applications()
     return [app for app in applications if app["username"] == username]
 
+@app.on_event("startup")
+def warm_up():
+    load_users()
+    load_applications()
+    warm_up_context(pwd_context)
+
 @app.get("/")
 def root():
     return {"message": "Job Application Tracker API"}
 
+@app.get("/login_stats/")
+def login_stats():
+    return login_guard.stats()
+
 @app.post("/applications/", response_model=JobApplicationResponse)
 def add_application(
     application: JobApplicationCreate,
@@ -1,36 +1,50 @@
-from fastapi import HTTPException, Depends, status
+from fastapi import HTTPException, Depends, Request, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from passlib.context import CryptContext
+from functools import lru_cache
+import copy
 import json
 import os
+from common.security import get_context
+from common.ratelimit import login_guard, client_ip
+from common.storage import read_json, write_json
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = get_context("shop")
 
 security = HTTPBasic()
 
 ADMIN_ROLE = "admin"
 CUSTOMER_ROLE = "customer"
 
-USERS_FILE = "users.json"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+USERS_FILE = os.path.join(BASE_DIR, "users.json")
+
+# Hashing the default passwords is slow, so it happens once per process.
+# Run seed.py to write users.json ahead of time instead.
+@lru_cache(maxsize=None)
+def build_default_users():
+    return {
+        "admin": {
+            "username": "admin",
+            "password": hash_password("admin123"),
+            "role": ADMIN_ROLE
+        },
+        "user1": {
+            "username": "user1",
+            "password": hash_password("user123"),
+            "role": CUSTOMER_ROLE
+        }
+    }
 
 def load_users():
     try:
-        if os.path.exists(USERS_FILE):
-            with open(USERS_FILE, 'r') as f:
-                return json.load(f)
-        default_users = {
-            "admin": {
-                "username": "admin",
-                "password": hash_password("admin123"),
-                "role": ADMIN_ROLE
-            },
-            "user1": {
-                "username": "user1",
-                "password": hash_password("user123"),
-                "role": CUSTOMER_ROLE
-            }
-        }
-        save_users(default_users)
+        users = read_json(USERS_FILE)
+        if users is not None:
+            return users
+        default_users = copy.deepcopy(build_default_users())
+        try:
+            save_users(default_users)
+        except HTTPException as e:
+            print(f"Error seeding users file: {e.detail}")
         return default_users
     except (json.JSONDecodeError, IOError) as e:
         print(f"Error loading users file: {e}")
@@ -38,32 +52,22 @@ def load_users():
 
 def save_users(users_data):
     try:
-        with open(USERS_FILE, 'w') as f:
-            json.dump(users_data, f, indent=2)
+        write_json(USERS_FILE, users_data)
     except IOError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error saving user data: {str(e)}"
         )
-    
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-def authenticate_user(credentials: HTTPBasicCredentials = Depends(security)):
-    users = load_users()
-    
-    if credentials.username not in users:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid credentials",
-            headers={"WWW-Authenticate": "Basic"},
-        )
-    
-    user_data = users[credentials.username]
-    if not verify_password(credentials.password, user_data["password"]):
+def authenticate_user(request: Request, credentials: HTTPBasicCredentials = Depends(security)):
+    user_data = login_guard.authenticate(
+        credentials.username, credentials.password, client_ip(request),
+        USERS_FILE, load_users, pwd_context
+    )
+    if user_data is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
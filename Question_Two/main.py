@@ -3,12 +3,22 @@ from pydantic import BaseModel
 from typing import List
 import json
 import os
-from auth import require_admin, require_authenticated
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.security import warm_up_context
+from common.ratelimit import login_guard
+from common.storage import read_json, write_json
+from auth import require_admin, require_authenticated, load_users, pwd_context
 
 app = FastAPI(title="Shopping Cart API", version="1.0.0")
 
-PRODUCTS_FILE = "products.json"
-CART_FILE = "cart.json"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PRODUCTS_FILE = os.path.join(BASE_DIR, "products.json")
+CART_FILE = os.path.join(BASE_DIR, "cart.json")
 
 class User(BaseModel):
     username: str
@@ -38,18 +48,14 @@ class CartAdd(BaseModel):
 
 def load_products():
     try:
-        if os.path.exists(PRODUCTS_FILE):
-            with open(PRODUCTS_FILE, 'r') as f:
-                return json.load(f)
-        return []
+        return read_json(PRODUCTS_FILE, [])
     except (json.JSONDecodeError, IOError) as e:
         print(f"Error loading products file: {e}")
         return []
 
 def save_products(products_data):
     try:
-        with open(PRODUCTS_FILE, 'w') as f:
-            json.dump(products_data, f, indent=2)
+        write_json(PRODUCTS_FILE, products_data)
     except IOError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -58,18 +64,14 @@ def save_products(products_data):
 
 def load_cart():
     try:
-        if os.path.exists(CART_FILE):
-            with open(CART_FILE, 'r') as f:
-                return json.load(f)
-        return []
+        return read_json(CART_FILE, [])
     except (json.JSONDecodeError, IOError) as e:
         print(f"Error loading cart file: {e}")
         return []
 
 def save_cart(cart_data):
     try:
-        with open(CART_FILE, 'w') as f:
-            json.dump(cart_data, f, indent=2)
+        write_json(CART_FILE, cart_data)
     except IOError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -82,10 +84,21 @@ def get_next_product_id():
         return 1
     return max(p["id"] for p in products) + 1
 
+@app.on_event("startup")
+def warm_up():
+    load_users()
+    load_products()
+    load_cart()
+    warm_up_context(pwd_context)
+
 @app.get("/")
 def root():
     return {"message": "Shopping Cart API"}
 
+@app.get("/login_stats/")
+def login_stats():
+    return login_guard.stats()
+
 @app.post("/admin/add_product/", response_model=dict)
 def add_product(product: ProductCreate, admin_user: dict = Depends(require_admin)):
     products = load_products()
@@ -0,0 +1,78 @@
+from common.security import SUPPORTED_SCHEMES, hashing_settings
+import argparse
+import time
+
+SAMPLE_PASSWORD = "calibration-password"
+SAMPLES = 3
+MAX_BCRYPT_ROUNDS = 20
+MAX_ARGON2_TIME_COST = 20
+
+def time_verify(handler) -> float:
+    hashed = handler.hash(SAMPLE_PASSWORD)
+    best = float("inf")
+    for _ in range(SAMPLES):
+        started = time.perf_counter()
+        handler.verify(SAMPLE_PASSWORD, hashed)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def calibrate_bcrypt(target_seconds: float, settings: dict) -> dict:
+    from passlib.hash import bcrypt
+
+    chosen = 4
+    for rounds in range(4, MAX_BCRYPT_ROUNDS + 1):
+        elapsed = time_verify(bcrypt.using(rounds=rounds))
+        print(f"bcrypt rounds={rounds}: {elapsed * 1000:.1f} ms")
+        if elapsed > target_seconds:
+            break
+        chosen = rounds
+    return {"PASSWORD_SCHEME": "bcrypt", "BCRYPT_ROUNDS": chosen}
+
+def calibrate_argon2(target_seconds: float, settings: dict) -> dict:
+    from passlib.hash import argon2
+
+    if not argon2.has_backend():
+        raise SystemExit("argon2 calibration requires the argon2-cffi package")
+
+    memory_cost = int(settings["ARGON2_MEMORY_COST"])
+    parallelism = int(settings["ARGON2_PARALLELISM"])
+    chosen = 1
+    for time_cost in range(1, MAX_ARGON2_TIME_COST + 1):
+        handler = argon2.using(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+        elapsed = time_verify(handler)
+        print(f"argon2 time_cost={time_cost} memory_cost={memory_cost} KiB: {elapsed * 1000:.1f} ms")
+        if elapsed > target_seconds:
+            break
+        chosen = time_cost
+    return {
+        "PASSWORD_SCHEME": "argon2",
+        "ARGON2_TIME_COST": chosen,
+        "ARGON2_MEMORY_COST": memory_cost,
+        "ARGON2_PARALLELISM": parallelism,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Find the password hashing cost that stays within a target verify time on this machine"
+    )
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--scheme", choices=SUPPORTED_SCHEMES)
+    parser.add_argument("--service", help="print settings for one service, e.g. notes")
+    parser.add_argument("--memory-cost", type=int, help="argon2 memory in KiB")
+    parser.add_argument("--parallelism", type=int, help="argon2 lanes")
+    args = parser.parse_args()
+
+    settings = hashing_settings(args.service)
+    if args.memory_cost:
+        settings["ARGON2_MEMORY_COST"] = args.memory_cost
+    if args.parallelism:
+        settings["ARGON2_PARALLELISM"] = args.parallelism
+    scheme = args.scheme or settings["PASSWORD_SCHEME"]
+
+    calibrate = calibrate_argon2 if scheme == "argon2" else calibrate_bcrypt
+    recommended = calibrate(args.target_ms / 1000, settings)
+
+    prefix = f"{args.service.upper()}_" if args.service else ""
+    print("\nRecommended settings:")
+    for name, value in recommended.items():
+        print(f"{prefix}{name}={value}")
@@ -0,0 +1,55 @@
+import argparse
+import base64
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def wait_for_success(url: str, credentials: str, timeout: float) -> bool:
+    request = urllib.request.Request(url)
+    if credentials:
+        token = base64.b64encode(credentials.encode()).decode()
+        request.add_header("Authorization", f"Basic {token}")
+
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.01)
+    return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Start the gateway and time how long its first successful response takes"
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--path", default="/jobs/applications/")
+    parser.add_argument("--user", default="john:john123", help="Basic auth credentials, empty for none")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(BASE_DIR, "gateway.py"),
+         "--host", "127.0.0.1", "--port", str(args.port), "--workers", str(args.workers)],
+        cwd=BASE_DIR,
+    )
+    try:
+        ok = wait_for_success(f"http://127.0.0.1:{args.port}{args.path}", args.user, args.timeout)
+        elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+
+    if not ok:
+        raise SystemExit(f"No successful response from {args.path} within {args.timeout:.0f} s")
+    print(f"First successful response from {args.path} after {elapsed * 1000:.0f} ms")
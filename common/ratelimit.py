@@ -0,0 +1,172 @@
+from fastapi import HTTPException, Request, status
+from collections import OrderedDict
+import math
+import os
+import threading
+import time
+from common import security
+from common.storage import file_version, update_json
+
+# Token bucket limits for login attempts that would run bcrypt. A rate of 0
+# turns that limiter off. Override with environment variables.
+LOGIN_IP_RATE = float(os.environ.get("LOGIN_IP_RATE", "1"))
+LOGIN_IP_BURST = int(os.environ.get("LOGIN_IP_BURST", "20"))
+LOGIN_USERNAME_RATE = float(os.environ.get("LOGIN_USERNAME_RATE", "0.2"))
+LOGIN_USERNAME_BURST = int(os.environ.get("LOGIN_USERNAME_BURST", "5"))
+LIMITER_MAX_KEYS = int(os.environ.get("LOGIN_LIMITER_MAX_KEYS", "10000"))
+UNKNOWN_USER_CACHE_SIZE = int(os.environ.get("UNKNOWN_USER_CACHE_SIZE", "10000"))
+
+class TokenBucketLimiter:
+    def __init__(self, rate: float, burst: int, max_keys: int = LIMITER_MAX_KEYS):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.allowed = 0
+        self.limited = 0
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key) -> float:
+        # Returns 0 when the attempt may go ahead, otherwise the number of
+        # seconds until the next token is available.
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = self.burst
+            else:
+                tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+                self.allowed += 1
+            else:
+                retry_after = (1 - tokens) / self.rate
+                self.limited += 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return retry_after
+
+    def stats(self) -> dict:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tracked_keys": len(self._buckets),
+            "allowed": self.allowed,
+            "limited": self.limited,
+        }
+
+class UnknownUserCache:
+    # Usernames known to be missing from a users file, remembered against the
+    # file version they were looked up in. Any write to the file (such as a
+    # new registration) changes the version and so expires the entries.
+    def __init__(self, max_size: int = UNKNOWN_USER_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def contains(self, users_file: str, username: str, version) -> bool:
+        with self._lock:
+            key = (users_file, username)
+            if key not in self._entries or self._entries[key] != version:
+                return False
+            self.hits += 1
+            return True
+
+    def add(self, users_file: str, username: str, version):
+        with self._lock:
+            self._entries[(users_file, username)] = version
+            self._entries.move_to_end((users_file, username))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits}
+
+class LoginGuard:
+    def __init__(self):
+        self.ip_limiter = TokenBucketLimiter(LOGIN_IP_RATE, LOGIN_IP_BURST)
+        self.username_limiter = TokenBucketLimiter(LOGIN_USERNAME_RATE, LOGIN_USERNAME_BURST)
+        self.unknown_users = UnknownUserCache()
+        self.dummy_verifies = 0
+        self.rehashed = 0
+
+    def check(self, users_file: str, username: str, client_ip: str):
+        # Usernames are only unique within one users file: john on /jobs
+        # and john on /notes are different accounts with separate buckets.
+        retry_after = self.ip_limiter.acquire(client_ip)
+        if not retry_after:
+            retry_after = self.username_limiter.acquire((users_file, username))
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts, try again later",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+    def find_user(self, username: str, users_file: str, load_users):
+        version = file_version(users_file)
+        if self.unknown_users.contains(users_file, username, version):
+            return None
+        users = load_users()
+        if username in users:
+            return users[username]
+        self.unknown_users.add(users_file, username, version)
+        return None
+
+    def authenticate(self, username: str, password: str, client_ip: str, users_file: str, load_users, context):
+        # Returns the user record, or None for a wrong username or password.
+        # Raises 429 before any bcrypt work once a limit is reached.
+        user_data = self.find_user(username, users_file, load_users)
+        if user_data is not None and security.credential_cache.contains(password, user_data["password"]):
+            return user_data
+
+        self.check(users_file, username, client_ip)
+
+        if user_data is None:
+            self.dummy_verifies += 1
+            security.dummy_verify(context)
+            return None
+        verified, new_hash = security.verify_and_update(password, user_data["password"], context)
+        if not verified:
+            return None
+        if new_hash:
+            self.store_rehash(users_file, username, user_data["password"], new_hash)
+            user_data["password"] = new_hash
+        return user_data
+
+    def store_rehash(self, users_file: str, username: str, old_hash: str, new_hash: str):
+        def replace_hash(users):
+            if username not in users or users[username]["password"] != old_hash:
+                return None
+            users[username]["password"] = new_hash
+            return users
+
+        try:
+            updated = update_json(users_file, replace_hash, {})
+        except (ValueError, OSError) as e:
+            # The login itself succeeded; the upgrade is retried next time.
+            print(f"Error storing upgraded password hash for {username}: {e}")
+            return
+        if updated is not None:
+            self.rehashed += 1
+
+    def stats(self) -> dict:
+        return {
+            "ip": self.ip_limiter.stats(),
+            "username": self.username_limiter.stats(),
+            "unknown_users": self.unknown_users.stats(),
+            "dummy_verifies": self.dummy_verifies,
+            "rehashed": self.rehashed,
+            "verify_seconds": security.verify_timings(),
+        }
+
+login_guard = LoginGuard()
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
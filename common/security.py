@@ -0,0 +1,188 @@
+from collections import OrderedDict
+import hashlib
+import hmac
+import os
+import threading
+import time
+
+SUPPORTED_SCHEMES = ("bcrypt", "argon2")
+
+# Hashing defaults, overridable through environment variables. Prefixing a
+# variable with a service name (STUDENTS_, SHOP_, JOBS_, NOTES_) applies it
+# to that service only, e.g. NOTES_PASSWORD_SCHEME=argon2.
+HASHING_DEFAULTS = {
+    "PASSWORD_SCHEME": "bcrypt",
+    "BCRYPT_ROUNDS": "12",
+    # OWASP's minimum recommended argon2id parameters (memory in KiB).
+    "ARGON2_TIME_COST": "2",
+    "ARGON2_MEMORY_COST": "19456",
+    "ARGON2_PARALLELISM": "1",
+}
+
+CREDENTIAL_CACHE_SIZE = 1024
+CREDENTIAL_CACHE_TTL_SECONDS = 300
+
+# Starting estimate of one verify; replaced by timings measured per context.
+VERIFY_SECONDS_ESTIMATE = 0.25
+
+class CredentialCache:
+    # Remembers recently verified (password, hash) pairs so Basic-auth clients
+    # don't pay a full bcrypt round on every request. Only HMAC fingerprints
+    # under a per-process random key are kept, never the plain password.
+    def __init__(self, max_size: int = CREDENTIAL_CACHE_SIZE, ttl: float = CREDENTIAL_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._key = os.urandom(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _fingerprint(self, plain_password: str, hashed_password: str) -> bytes:
+        message = f"{hashed_password}\0{plain_password}".encode("utf-8")
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def contains(self, plain_password: str, hashed_password: str) -> bool:
+        fingerprint = self._fingerprint(plain_password, hashed_password)
+        with self._lock:
+            expires_at = self._entries.get(fingerprint)
+            if expires_at is None:
+                return False
+            if expires_at < time.monotonic():
+                del self._entries[fingerprint]
+                return False
+            self._entries.move_to_end(fingerprint)
+            return True
+
+    def add(self, plain_password: str, hashed_password: str):
+        fingerprint = self._fingerprint(plain_password, hashed_password)
+        with self._lock:
+            self._entries[fingerprint] = time.monotonic() + self.ttl
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+def hashing_settings(service: str = None) -> dict:
+    settings = {}
+    for name, default in HASHING_DEFAULTS.items():
+        value = os.environ.get(name, default)
+        if service:
+            value = os.environ.get(f"{service.upper()}_{name}", value)
+        settings[name] = value
+    return settings
+
+def build_context(settings: dict):
+    from passlib.context import CryptContext
+
+    scheme = settings["PASSWORD_SCHEME"]
+    if scheme not in SUPPORTED_SCHEMES:
+        raise ValueError(f"Unsupported password scheme: {scheme}")
+    if scheme == "argon2":
+        from passlib.hash import argon2
+        if not argon2.has_backend():
+            raise RuntimeError("PASSWORD_SCHEME=argon2 requires the argon2-cffi package")
+
+    # The configured scheme hashes new passwords. The other one stays
+    # verifiable but is marked deprecated, as are hashes made with other
+    # cost settings, so they get rehashed on the next successful login.
+    return CryptContext(
+        schemes=[scheme] + [other for other in SUPPORTED_SCHEMES if other != scheme],
+        deprecated="auto",
+        bcrypt__rounds=int(settings["BCRYPT_ROUNDS"]),
+        argon2__time_cost=int(settings["ARGON2_TIME_COST"]),
+        argon2__memory_cost=int(settings["ARGON2_MEMORY_COST"]),
+        argon2__parallelism=int(settings["ARGON2_PARALLELISM"]),
+    )
+
+# Services with identical settings share one context, and one estimate of
+# how long a verify with it takes.
+_contexts = {}
+_verify_seconds = {}
+
+def _describe(settings_key) -> str:
+    settings = dict(settings_key)
+    if settings["PASSWORD_SCHEME"] == "argon2":
+        return (f"argon2 t={settings['ARGON2_TIME_COST']} m={settings['ARGON2_MEMORY_COST']}"
+                f" p={settings['ARGON2_PARALLELISM']}")
+    return f"bcrypt rounds={settings['BCRYPT_ROUNDS']}"
+
+def verify_timings() -> dict:
+    return {_describe(key): round(seconds, 4) for key, seconds in _verify_seconds.items()}
+
+class LazyContext:
+    # Stands in for a passlib CryptContext and builds it on first use, so
+    # importing a service doesn't import passlib or load a hash backend.
+    def __init__(self, service: str = None):
+        self.service = service
+        self._key = None
+        self._context = None
+
+    def load(self):
+        if self._context is None:
+            settings = hashing_settings(self.service)
+            key = tuple(sorted(settings.items()))
+            if key not in _contexts:
+                _contexts[key] = build_context(settings)
+            self._key = key
+            self._context = _contexts[key]
+        return self._context
+
+    @property
+    def verify_seconds(self) -> float:
+        self.load()
+        return _verify_seconds.get(self._key, VERIFY_SECONDS_ESTIMATE)
+
+    def record_verify(self, elapsed: float):
+        self.load()
+        estimate = _verify_seconds.get(self._key)
+        if estimate is None:
+            _verify_seconds[self._key] = elapsed
+        else:
+            _verify_seconds[self._key] = estimate + 0.2 * (elapsed - estimate)
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
+def get_context(service: str = None) -> LazyContext:
+    return LazyContext(service)
+
+credential_cache = CredentialCache()
+
+# ids of contexts already warmed up in this process (or its fork parent).
+_warmed_contexts = set()
+
+def warm_up_context(context: LazyContext):
+    # Builds the context, loads its hash backend and times one hash, which
+    # costs the same as a verify and so seeds that context's estimate.
+    crypt_context = context.load()
+    if id(crypt_context) in _warmed_contexts:
+        return
+    # Loading the backend runs passlib's self-tests; keep that out of the timing.
+    crypt_context.handler().get_backend()
+    started = time.perf_counter()
+    crypt_context.hash("warm-up-password")
+    context.record_verify(time.perf_counter() - started)
+    _warmed_contexts.add(id(crypt_context))
+
+def verify_and_update(plain_password: str, hashed_password: str, context: LazyContext):
+    # Returns (verified, new_hash). new_hash is set when the stored hash uses
+    # an outdated scheme or cost and should be replaced.
+    if credential_cache.contains(plain_password, hashed_password):
+        return True, None
+    started = time.perf_counter()
+    verified, new_hash = context.verify_and_update(plain_password, hashed_password)
+    context.record_verify(time.perf_counter() - started)
+    if not verified:
+        return False, None
+    credential_cache.add(plain_password, hashed_password)
+    if new_hash:
+        credential_cache.add(plain_password, new_hash)
+    return True, new_hash
+
+def dummy_verify(context: LazyContext):
+    # Stand-in for verifying an unknown user: takes as long as a real verify
+    # with the same context, so response times don't reveal which usernames
+    # exist, but sleeps instead of burning a CPU core on bcrypt.
+    time.sleep(context.verify_seconds)
@@ -0,0 +1,123 @@
+from contextlib import contextmanager
+import json
+import os
+import pickle
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes are only serialized within one process.
+    fcntl = None
+
+# Per-file write locks, shared by every service running in this process.
+_write_locks = {}
+_write_locks_guard = threading.Lock()
+
+# Parsed files kept in memory: absolute path -> (file version, pickled data).
+# Every write bumps a generation counter kept next to the data file, so
+# comparing versions spots writes made by any worker or process without
+# re-reading the file. The stat part of the version also catches edits
+# made outside this module.
+_read_cache = {}
+
+GENERATION_WIDTH = 20
+
+def _write_lock(path: str) -> threading.Lock:
+    with _write_locks_guard:
+        return _write_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+def _generation_path(path: str) -> str:
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, f".{name}.gen")
+
+def _read_generation(path: str) -> int:
+    try:
+        with open(_generation_path(path), 'rb') as f:
+            return int(f.read(GENERATION_WIDTH) or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+def _signature(generation: int, stat_result):
+    return (generation, stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size)
+
+def file_version(path: str):
+    # Read the generation before the stat: a write landing in between then
+    # only makes the version look older than the data, never newer.
+    generation = _read_generation(path)
+    try:
+        return _signature(generation, os.stat(path))
+    except FileNotFoundError:
+        return None
+
+@contextmanager
+def _locked(path: str):
+    # Serializes writers to one file: threads through _write_lock, other
+    # processes through an flock on the generation file. Yields its fd.
+    key = os.path.abspath(path)
+    with _write_lock(key):
+        fd = os.open(_generation_path(key), os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield fd
+        finally:
+            os.close(fd)
+
+def read_json(path: str, default=None):
+    key = os.path.abspath(path)
+    version = file_version(key)
+    # An empty file (the repo ships some) counts as missing, as in seed.py.
+    if version is None or version[-1] == 0:
+        _read_cache.pop(key, None)
+        return default
+
+    cached = _read_cache.get(key)
+    if cached is not None and cached[0] == version:
+        # Callers modify what they load, so each one gets its own copy.
+        return pickle.loads(cached[1])
+
+    with open(key, 'r') as f:
+        version = _signature(version[0], os.fstat(f.fileno()))
+        data = json.load(f)
+    _read_cache[key] = (version, pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+    return data
+
+def _write_locked(key: str, generation_fd: int, data, dump_kwargs: dict):
+    # Write to a temporary file and rename it over the target, so concurrent
+    # readers never see a half-written file, then bump the generation.
+    tmp_path = os.path.join(
+        os.path.dirname(key), f".{os.path.basename(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2, **dump_kwargs)
+        os.replace(tmp_path, key)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    finally:
+        _read_cache.pop(key, None)
+
+    os.lseek(generation_fd, 0, os.SEEK_SET)
+    generation = int(os.read(generation_fd, GENERATION_WIDTH) or 0) + 1
+    os.lseek(generation_fd, 0, os.SEEK_SET)
+    os.write(generation_fd, str(generation).zfill(GENERATION_WIDTH).encode())
+
+def write_json(path: str, data, **dump_kwargs):
+    key = os.path.abspath(path)
+    with _locked(key) as generation_fd:
+        _write_locked(key, generation_fd, data, dump_kwargs)
+
+def update_json(path: str, update, default=None, **dump_kwargs):
+    # Load, change and save a file under its write lock, so a concurrent
+    # update from another thread or worker can't be lost in between.
+    # update() gets the current data and returns what to save, or None to
+    # leave the file untouched. Returns what update() returned.
+    key = os.path.abspath(path)
+    with _locked(key) as generation_fd:
+        updated = update(read_json(key, default))
+        if updated is not None:
+            _write_locked(key, generation_fd, updated, dump_kwargs)
+        return updated
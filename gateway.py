@@ -0,0 +1,144 @@
+from fastapi import FastAPI
+from starlette.routing import Mount
+import anyio.to_thread
+import argparse
+import gc
+import importlib.util
+import os
+import signal
+import socket
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SERVICES = [
+    ("/students", "Question_One"),
+    ("/shop", "Question_Two"),
+    ("/jobs", "Question_Three"),
+    ("/notes", "Question_Four"),
+]
+
+# Helper modules the services import by bare name ("from auth import ...").
+# Every service needs its own copy, so they are loaded in isolation.
+LOCAL_MODULES = ("auth", "student")
+
+THREADPOOL_SIZE = 40
+
+def service_module(directory: str, name: str):
+    # A module of an already loaded service, e.g. ("Question_Two", "auth").
+    return sys.modules[f"{directory.lower()}_{name}"]
+
+def load_service(directory: str):
+    service_dir = os.path.join(BASE_DIR, directory)
+    module_prefix = directory.lower()
+    saved_modules = {name: sys.modules.pop(name) for name in LOCAL_MODULES if name in sys.modules}
+    sys.path.insert(0, service_dir)
+    try:
+        spec = importlib.util.spec_from_file_location(
+            f"{module_prefix}_main", os.path.join(service_dir, "main.py")
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(service_dir)
+        for name in LOCAL_MODULES:
+            local_module = sys.modules.pop(name, None)
+            if local_module is not None:
+                sys.modules[f"{module_prefix}_{name}"] = local_module
+        sys.modules.update(saved_modules)
+    return module
+
+def create_app():
+    gateway = FastAPI(title="FastAPI Projects Gateway", version="1.0.0")
+
+    for prefix, directory in SERVICES:
+        gateway.mount(prefix, load_service(directory).app)
+
+    @gateway.on_event("startup")
+    def configure_threadpool():
+        # Sync endpoints of all four services run on this one thread pool.
+        anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+    @gateway.on_event("startup")
+    def startup_services():
+        warm_up_services(gateway)
+
+    @gateway.get("/")
+    def root():
+        return {
+            "message": "FastAPI Projects Gateway",
+            "services": [prefix for prefix, _ in SERVICES],
+        }
+
+    return gateway
+
+def warm_up_services(gateway: FastAPI):
+    # Mounted apps don't get startup events of their own, so run their
+    # handlers here. Repeating them is cheap: what they load stays cached.
+    started = time.perf_counter()
+    for route in gateway.routes:
+        if isinstance(route, Mount):
+            for handler in route.app.router.on_startup:
+                handler()
+    print(f"Services warmed up in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+app = create_app()
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+def serve(host: str, port: int, workers: int):
+    import uvicorn
+
+    config = uvicorn.Config(app, host=host, port=port)
+    sock = bind_socket(host, port)
+
+    if workers <= 1 or not hasattr(os, "fork"):
+        uvicorn.Server(config).run(sockets=[sock])
+        return
+
+    # Warm up once in the parent, so workers inherit loaded backends and
+    # cached data instead of each building their own. Freezing the GC keeps
+    # collections in the workers from touching (and so copying) those pages
+    # after the fork.
+    warm_up_services(app)
+    gc.freeze()
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            uvicorn.Server(config).run(sockets=[sock])
+            os._exit(0)
+        children.append(pid)
+
+    def stop_workers(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop_workers)
+    signal.signal(signal.SIGINT, stop_workers)
+
+    for pid in children:
+        os.waitpid(pid, 0)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run all four APIs in one process")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=THREADPOOL_SIZE)
+    args = parser.parse_args()
+
+    THREADPOOL_SIZE = args.threads
+    serve(args.host, args.port, args.workers)
@@ -0,0 +1,40 @@
+from gateway import SERVICES, service_module
+from common.storage import write_json
+import argparse
+import os
+
+# (project, module, file constant, initial contents). A string names a
+# function in that module which builds the contents.
+SEED_FILES = [
+    ("Question_One", "student", "STUDENTS_FILE", {}),
+    ("Question_Two", "auth", "USERS_FILE", "build_default_users"),
+    ("Question_Two", "main", "PRODUCTS_FILE", []),
+    ("Question_Two", "main", "CART_FILE", []),
+    ("Question_Three", "auth", "USERS_FILE", "build_default_users"),
+    ("Question_Three", "main", "APPLICATIONS_FILE", []),
+    ("Question_Four", "auth", "USERS_FILE", "build_default_users"),
+]
+
+def seed(force: bool = False):
+    loaded = {directory for _, directory in SERVICES}
+    for directory, module_name, file_constant, contents in SEED_FILES:
+        if directory not in loaded:
+            continue
+        module = service_module(directory, module_name)
+        path = getattr(module, file_constant)
+        if not force and os.path.exists(path) and os.path.getsize(path) > 0:
+            print(f"Kept {os.path.relpath(path)}")
+            continue
+        if isinstance(contents, str):
+            contents = getattr(module, contents)()
+        write_json(path, contents)
+        print(f"Seeded {os.path.relpath(path)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Write the data files, including hashed default users, ahead of time"
+    )
+    parser.add_argument("--force", action="store_true", help="overwrite files that already have data")
+    args = parser.parse_args()
+
+    seed(args.force)